@@ -4,6 +4,7 @@ import asyncio
 import datetime
 import json
 import time
+from pathlib import Path
 from typing import Callable
 
 from telegram_utils import (
@@ -78,8 +79,6 @@ def build_cleanup_prompt(task_name: str, task_data: dict) -> str:
 
 def build_summarize_prompt(tasks: list[tuple[str, dict]]) -> str:
     """Build the summarize request prompt for operator."""
-    from pathlib import Path
-
     lines = ["=" * 40]
     lines.append("SUMMARIZE REQUEST")
     lines.append("=" * 40)
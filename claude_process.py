@@ -1,6 +1,7 @@
 """ClaudeProcess - manages Claude subprocess with stream-json I/O."""
 
 import asyncio
+import ctypes
 import json
 import os
 import signal
@@ -11,6 +12,8 @@ from typing import AsyncIterator, Optional
 
 from telegram_utils import log
 
+READ_CHUNK = 64 * 1024  # Bytes per stdout/stderr read
+
 
 def _set_pdeathsig():
     """Set PR_SET_PDEATHSIG to SIGTERM so child dies when parent exits.
@@ -20,7 +23,6 @@ def _set_pdeathsig():
     if sys.platform != 'linux':
         return
     try:
-        import ctypes
         libc = ctypes.CDLL("libc.so.6", use_errno=True)
         PR_SET_PDEATHSIG = 1
         libc.prctl(PR_SET_PDEATHSIG, signal.SIGTERM, 0, 0, 0)
@@ -28,7 +30,7 @@ def _set_pdeathsig():
         pass
 
 
-@dataclass
+@dataclass(slots=True)
 class SystemInit:
     """Claude system initialization event."""
     session_id: str
@@ -37,7 +39,7 @@ class SystemInit:
     raw: dict = field(default_factory=dict)  # Full event data
 
 
-@dataclass
+@dataclass(slots=True)
 class AssistantMessage:
     """Claude assistant message event."""
     content: list[dict]  # Content blocks (text, thinking, tool_use)
@@ -46,7 +48,7 @@ class AssistantMessage:
     raw: dict = field(default_factory=dict)  # Full event data
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolUse:
     """Claude tool_use block within assistant message."""
     id: str
@@ -55,7 +57,7 @@ class ToolUse:
     raw: dict = field(default_factory=dict)  # Full block data
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionResult:
     """Claude session completion event."""
     success: bool
@@ -65,7 +67,7 @@ class SessionResult:
     raw: dict = field(default_factory=dict)  # Full event data
 
 
-@dataclass
+@dataclass(slots=True)
 class UserMessage:
     """User message sent to Claude (for echo/acknowledgment)."""
     content: list[dict]
@@ -198,24 +200,23 @@ class ClaudeProcess:
             return
 
         try:
-            while self._running:
-                line_bytes = await self.process.stdout.readline()
-                if not line_bytes:
-                    # EOF - process terminated
-                    log("Claude process stdout closed")
+            async for line_bytes in self._iter_lines(self.process.stdout):
+                if not self._running:
                     break
-
-                line = line_bytes.decode('utf-8').strip()
+                line = line_bytes.strip()
                 if not line:
                     continue
 
-                # Parse JSONL
+                # Parse JSONL straight from bytes (json detects the encoding)
                 try:
                     event = json.loads(line)
-                    await self._process_event(event)
-                except json.JSONDecodeError as e:
-                    log(f"Failed to parse JSON: {e} - line: {line[:100]}")
+                except ValueError as e:  # JSONDecodeError or UnicodeDecodeError
+                    log(f"Failed to parse JSON: {e} - line: {line[:100].decode('utf-8', 'replace')}")
                     continue
+                await self._process_event(event)
+            else:
+                # EOF - process terminated
+                log("Claude process stdout closed")
 
         except asyncio.CancelledError:
             log("stdout reader cancelled")
@@ -225,18 +226,41 @@ class ClaudeProcess:
             # Signal end of stream
             await self._event_queue.put(None)
 
+    @staticmethod
+    async def _iter_lines(stream: asyncio.StreamReader) -> AsyncIterator[bytes]:
+        """Yield lines (without the newline) from stream until EOF, however long.
+
+        Reads READ_CHUNK bytes at a time and splits each chunk in one go, so a
+        burst of events costs one read instead of one per line. A line that
+        spans chunks is carried over (joined once, not re-concatenated per
+        chunk); a final unterminated line is still yielded at EOF.
+        StreamReader.readline() instead raises past its 64 KiB limit and
+        discards the data, which large tool results easily hit.
+        """
+        partial: list[bytes] = []
+        while chunk := await stream.read(READ_CHUNK):
+            *lines, tail = chunk.split(b"\n")
+            if lines and partial:
+                partial.append(lines[0])
+                lines[0] = b"".join(partial)
+                partial = []
+            for line in lines:
+                yield line
+            if tail:
+                partial.append(tail)
+        if partial:
+            yield b"".join(partial)
+
     async def _read_stderr(self):
         """Read stderr and log it."""
         if not self.process or not self.process.stderr:
             return
 
         try:
-            while self._running:
-                line_bytes = await self.process.stderr.readline()
-                if not line_bytes:
+            async for line_bytes in self._iter_lines(self.process.stderr):
+                if not self._running:
                     break
-
-                line = line_bytes.decode('utf-8').strip()
+                line = line_bytes.decode('utf-8', 'replace').strip()
                 if line:
                     log(f"Claude stderr: {line}")
 
@@ -7,6 +7,8 @@ Threading model:
 - Main event loop: asyncio (handles Claude events, Telegram polling, permission checks)
 - Permission HTTP server: separate daemon thread (threading.Thread)
 - Telegram polling: uses asyncio.to_thread() for blocking HTTP calls
+- Telegram messages: poller -> bounded queue -> one worker per task_id, so a
+  slow task never stalls messages for other tasks
 - Claude subprocesses: managed via asyncio.create_subprocess_exec()
 
 Shutdown:
@@ -21,18 +23,22 @@ import os
 import sys
 import threading
 import time
+import traceback
 from pathlib import Path
 
 from telegram_utils import log
 from registry import get_config, get_registry
 from process_manager import ProcessManager
-from permission_server import PermissionManager, start_permission_server, send_permission_notification
+from permission_server import (
+    PermissionManager, start_permission_server, send_permission_notification, DECISION_LABELS
+)
 from telegram_adapter import TelegramAdapter
 from claude_process import ClaudeProcess, SystemInit, AssistantMessage, SessionResult, extract_tool_uses, extract_text
 from bot_commands import CommandHandler
 
 DEFAULT_CONFIG_FILE = Path.home() / "telegram.json"
 DEFAULT_PID_FILE = Path("/tmp/claude-army-daemon.pid")
+TELEGRAM_QUEUE_SIZE = 64  # Bound on buffered Telegram messages (backpressure to poller)
 
 
 class DaemonAlreadyRunning(Exception):
@@ -96,6 +102,13 @@ class Daemon:
             get_task_stats=self.get_task_stats
         )
 
+        # Poller -> dispatcher queue; full queue pauses polling
+        self._telegram_queue: asyncio.Queue = asyncio.Queue(maxsize=TELEGRAM_QUEUE_SIZE)
+        # Per-task queues and workers: messages for one task are handled in order,
+        # independently of other tasks
+        self._task_queues: dict[str, asyncio.Queue] = {}
+        self._task_workers: dict[str, asyncio.Task] = {}
+
         self._running = False
 
     async def start(self) -> None:
@@ -212,6 +225,7 @@ class Daemon:
         await asyncio.gather(
             self._handle_claude_events(),
             self._handle_telegram_messages(),
+            self._dispatch_telegram_messages(),
             self._handle_permission_requests(),
         )
 
@@ -235,56 +249,103 @@ class Daemon:
             raise
 
     async def _handle_telegram_messages(self) -> None:
-        """Handle messages from Telegram."""
+        """Poll Telegram and enqueue messages (blocks when the queue is full)."""
         try:
             async for msg in self.telegram.incoming_messages():
                 log(f"Received: task_id={msg.task_id}, text={msg.text[:50] if msg.text else '(callback)'}")
-                try:
-                    # Handle callback queries (button clicks)
-                    if msg.callback_data:
-                        await self._handle_callback(msg)
-                        continue
-
-                    # Handle text messages
-                    if msg.text:
-                        # Check if it's a command
-                        if msg.text.startswith("/"):
-                            # Build a minimal telegram message dict for command handler
-                            topic_id = self._get_topic_id_for_task(msg.task_id)
-                            group_chat_id = self.telegram.get_group_chat_id()
-                            tg_msg = {
-                                "text": msg.text,
-                                "message_id": int(msg.msg_id),
-                                "chat": {"id": int(group_chat_id)},
-                                "message_thread_id": topic_id,
-                                "reply_to_message": msg.reply_to_message
-                            }
-                            log(f"Command: text={msg.text}, topic_id={topic_id}, chat_id={group_chat_id}, reply_to_message={msg.reply_to_message}")
-                            handled = await self.command_handler.handle_command(tg_msg)
-                            log(f"Command handled={handled}")
-                            if handled:
-                                continue
-
-                        # Route message to appropriate Claude process
-                        # Include reply context and metadata
-                        text = msg.text
-                        if msg.reply_to_message:
-                            reply_msg = msg.reply_to_message
-                            reply_text = reply_msg.get("text", "")
-                            reply_msg_id = reply_msg.get("message_id", "?")
-                            reply_from = reply_msg.get("from", {}).get("first_name", "?")
-                            topic_id = reply_msg.get("message_thread_id", "?")
-                            if reply_text:
-                                text = f"[Replying to msg_id={reply_msg_id} topic={topic_id} from={reply_from}]\n{reply_text}\n\n[msg_id={msg.msg_id}]\n{msg.text}"
-                        await self.telegram.show_typing(msg.task_id)
-                        await self._route_message_to_claude(msg.task_id, text)
-
-                except Exception as e:
-                    log(f"Error handling Telegram message: {e}")
+                await self._telegram_queue.put(msg)
         except asyncio.CancelledError:
             log("Telegram handler cancelled")
             raise
 
+    async def _dispatch_telegram_messages(self) -> None:
+        """Route queued messages to per-task workers, starting workers on demand."""
+        try:
+            while True:
+                msg = await self._telegram_queue.get()
+                queue = self._task_queues.get(msg.task_id)
+                if queue is None:
+                    queue = self._task_queues[msg.task_id] = asyncio.Queue(maxsize=TELEGRAM_QUEUE_SIZE)
+                    self._task_workers[msg.task_id] = asyncio.create_task(
+                        self._task_message_worker(msg.task_id, queue)
+                    )
+                await queue.put(msg)
+        except asyncio.CancelledError:
+            for worker in self._task_workers.values():
+                worker.cancel()
+            await asyncio.gather(*self._task_workers.values(), return_exceptions=True)
+            self._task_workers.clear()
+            self._task_queues.clear()
+            log("Telegram dispatcher cancelled")
+            raise
+
+    async def _task_message_worker(self, task_id: str, queue: asyncio.Queue) -> None:
+        """Handle one task's messages in arrival order, exiting once the queue drains.
+
+        Idle tasks hold no worker or queue; the dispatcher starts a fresh one on
+        the next message. No await between the empty check and the removal, so
+        the dispatcher never enqueues onto a worker that has already left.
+        """
+        while not queue.empty():
+            msg = queue.get_nowait()
+            try:
+                await self._handle_telegram_message(msg)
+            except Exception as e:
+                log(f"Error handling Telegram message: {e}")
+        del self._task_queues[task_id]
+        del self._task_workers[task_id]
+
+    async def _handle_telegram_message(self, msg) -> None:
+        """Handle a single Telegram message (callback, command, or text for Claude)."""
+        # Handle callback queries (button clicks)
+        if msg.callback_data:
+            await self._handle_callback(msg)
+            return
+
+        # Handle text messages
+        if msg.text:
+            # Check if it's a command
+            if msg.text.startswith("/"):
+                # Build a minimal telegram message dict for command handler
+                topic_id = self._get_topic_id_for_task(msg.task_id)
+                group_chat_id = self.telegram.get_group_chat_id()
+                tg_msg = {
+                    "text": msg.text,
+                    "message_id": int(msg.msg_id),
+                    "chat": {"id": int(group_chat_id)},
+                    "message_thread_id": topic_id,
+                    "reply_to_message": msg.reply_to_message
+                }
+                log(f"Command: text={msg.text}, topic_id={topic_id}, chat_id={group_chat_id}, reply_to_message={msg.reply_to_message}")
+                handled = await self.command_handler.handle_command(tg_msg)
+                log(f"Command handled={handled}")
+                if handled:
+                    return
+
+            # Route message to appropriate Claude process
+            # Include reply context and metadata
+            text = self._with_reply_context(msg)
+            await self.telegram.show_typing(msg.task_id)
+            await self._route_message_to_claude(msg.task_id, text)
+
+    @staticmethod
+    def _with_reply_context(msg) -> str:
+        """Prefix message text with the replied-to message, if it has text.
+
+        Replies to the topic root (implicit in forum topics) are skipped before
+        any field extraction or string building.
+        """
+        reply_msg = msg.reply_to_message
+        if not reply_msg or reply_msg.get("message_id") == reply_msg.get("message_thread_id"):
+            return msg.text
+        reply_text = reply_msg.get("text")
+        if not reply_text:
+            return msg.text
+        reply_msg_id = reply_msg.get("message_id", "?")
+        reply_from = reply_msg.get("from", {}).get("first_name", "?")
+        topic_id = reply_msg.get("message_thread_id", "?")
+        return f"[Replying to msg_id={reply_msg_id} topic={topic_id} from={reply_from}]\n{reply_text}\n\n[msg_id={msg.msg_id}]\n{msg.text}"
+
     async def _handle_permission_requests(self) -> None:
         """Handle permission requests via async iterator."""
         try:
@@ -402,12 +463,12 @@ class Daemon:
         action, data = msg.callback_data.split(":", 1)
 
         # Permission callbacks
-        if action in ("allow", "deny"):
+        label = DECISION_LABELS.get(action)
+        if label:
             decision = action
             reason = "User decision" if action == "allow" else "User denied"
             if self.permission_manager.respond(data, decision, reason):
                 # Update button to show decision
-                label = "✓ Allowed" if action == "allow" else "✗ Denied"
                 await self.telegram.update_message(msg.task_id, msg.msg_id, buttons=label)
 
     async def _route_message_to_claude(self, task_name: str, text: str) -> None:
@@ -503,7 +564,6 @@ async def main(config_file: Path = DEFAULT_CONFIG_FILE, pid_file: Path = DEFAULT
         # run() never returns normally - signal handler exits
     except Exception as e:
         log(f"Fatal error: {e}")
-        import traceback
         traceback.print_exc()
         cleanup_pid_file(pid_file)
         return 1
@@ -8,7 +8,7 @@ from dataclasses import dataclass
 from typing import AsyncIterator
 
 
-@dataclass
+@dataclass(slots=True)
 class IncomingMessage:
     """Represents an incoming message from the frontend.
 
@@ -18,7 +18,11 @@ from telegram_utils import (
 )
 
 
-@dataclass
+# Button label shown after a permission decision, keyed by callback action
+DECISION_LABELS = {"allow": "✓ Allowed", "deny": "✗ Denied"}
+
+
+@dataclass(slots=True)
 class PendingPermission:
     """Tracks a pending permission request."""
     tool_name: str
@@ -119,10 +123,9 @@ class PermissionManager:
             # Clean up
             with self._lock:
                 self.pending.pop(tool_use_id, None)
-                # Clean up msg mapping if exists
-                for msg_id, tid in list(self._msg_to_tool.items()):
-                    if tid == tool_use_id:
-                        del self._msg_to_tool[msg_id]
+                # Clean up msg mapping if exists (pending records its msg_id, no scan needed)
+                if pending.telegram_msg_id is not None:
+                    self._msg_to_tool.pop(pending.telegram_msg_id, None)
 
     def respond(self, tool_use_id: str, decision: Literal["allow", "deny"], reason: str = ""):
         """Respond to a pending permission request by tool_use_id.
@@ -323,7 +326,8 @@ def handle_permission_callback(
 
     action, tool_use_id = callback_data.split(":", 1)
 
-    if action not in ("allow", "deny"):
+    label = DECISION_LABELS.get(action)
+    if label is None:
         return False
 
     # Respond to permission
@@ -332,7 +336,6 @@ def handle_permission_callback(
         return False
 
     # Update button
-    label = "✓ Allowed" if action == "allow" else "✗ Denied"
     update_message_buttons(bot_token, chat_id, msg_id, label)
 
     # Answer callback
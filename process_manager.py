@@ -4,6 +4,8 @@ Manages a pool of Claude subprocess instances, routing events and persisting ses
 """
 
 import asyncio
+import os
+import signal
 from typing import AsyncIterator, Protocol
 
 from telegram_utils import log
@@ -456,9 +458,6 @@ class ProcessManager:
         Returns:
             List of task names that had crashed processes cleaned up
         """
-        import os
-        import signal
-
         registry = get_registry()
         cleaned = []
 
@@ -2,9 +2,11 @@
 
 import json
 import os
+import subprocess
 import tempfile
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 from telegram_utils import log
 
@@ -12,6 +14,7 @@ CLAUDE_ARMY_DIR = Path(__file__).parent / "operator"
 CONFIG_FILE = CLAUDE_ARMY_DIR / "config.json"
 REGISTRY_FILE = CLAUDE_ARMY_DIR / "registry.json"
 MARKER_FILE_NAME = "army.json"  # Lives inside .claude/ directory
+TOPIC_MAPPINGS_MAX = 500  # Newest topic_id -> name mappings kept in config
 
 
 def ensure_dir():
@@ -64,20 +67,31 @@ class ReloadableJSON:
         self._mtime = 0
         self._reload()
 
+    def _file_mtime(self) -> int:
+        """mtime of the file in ns (0 if missing), from a single stat call."""
+        try:
+            return self._path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
     def _reload(self) -> bool:
         """Read from disk. Returns True if successful."""
+        # Stat before reading: a write landing mid-read then shows as a newer mtime
+        try:
+            mtime = self._file_mtime()
+        except OSError:
+            mtime = 0
         data = _read_json(self._path)
         if data is not None:
             self._cache = data
-            self._mtime = self._path.stat().st_mtime if self._path.exists() else 0
+            self._mtime = mtime
             return True
         return False
 
     def _maybe_reload(self):
-        """Reload if file changed on disk."""
+        """Reload if file changed on disk (one stat when unchanged)."""
         try:
-            mtime = self._path.stat().st_mtime if self._path.exists() else 0
-            if mtime > self._mtime:
+            if self._file_mtime() > self._mtime:
                 self._reload()
         except OSError:
             pass
@@ -92,7 +106,7 @@ class ReloadableJSON:
         """Write to disk and update mtime."""
         _write_json(self._path, self._cache)
         try:
-            self._mtime = self._path.stat().st_mtime
+            self._mtime = self._path.stat().st_mtime_ns
         except OSError:
             pass
 
@@ -142,9 +156,15 @@ class Config(ReloadableJSON):
 
     # Topic mappings (for crash recovery)
     def store_topic_mapping(self, topic_id: int, name: str):
-        """Store topic_id -> name mapping (for crash recovery)."""
+        """Store topic_id -> name mapping (for crash recovery).
+
+        Keeps only the TOPIC_MAPPINGS_MAX most recently stored, oldest dropped first.
+        """
         mappings = self.get("topic_mappings", {})
+        mappings.pop(str(topic_id), None)  # Re-insert as newest
         mappings[str(topic_id)] = name
+        while len(mappings) > TOPIC_MAPPINGS_MAX:
+            del mappings[next(iter(mappings))]
         self.set("topic_mappings", mappings)
 
     def get_topic_name(self, topic_id: int) -> str | None:
@@ -364,7 +384,6 @@ def is_managed_directory(directory: str) -> bool:
 
 def write_marker_file_pending(directory: str, task_name: str):
     """Write pending marker before topic creation (crash recovery)."""
-    from datetime import datetime, timezone
     data = {
         "pending_topic_name": task_name,
         "pending_since": datetime.now(timezone.utc).isoformat()
@@ -374,7 +393,6 @@ def write_marker_file_pending(directory: str, task_name: str):
 
 def complete_pending_marker(directory: str, task_name: str, topic_id: int, task_type: str = "session"):
     """Complete a pending marker by adding topic_id and task metadata."""
-    from datetime import datetime, timezone
     data = {
         "name": task_name,
         "type": task_type,
@@ -384,10 +402,16 @@ def complete_pending_marker(directory: str, task_name: str, topic_id: int, task_
     write_marker_file(directory, data)
 
 
+def _iter_pending_markers() -> Iterator[dict]:
+    """Lazily yield markers with pending_topic_name but no topic_id."""
+    for m in iter_marker_files():
+        if m.get("pending_topic_name") and not m.get("topic_id"):
+            yield m
+
+
 def get_pending_markers() -> list[dict]:
     """Find all markers with pending_topic_name but no topic_id."""
-    markers = scan_for_marker_files()
-    return [m for m in markers if m.get("pending_topic_name") and not m.get("topic_id")]
+    return list(_iter_pending_markers())
 
 
 def get_pending_marker_names() -> list[str]:
@@ -396,8 +420,11 @@ def get_pending_marker_names() -> list[str]:
 
 
 def find_pending_marker_by_name(task_name: str) -> dict | None:
-    """Find a pending marker by task name. Returns marker data with 'path' or None."""
-    for marker in get_pending_markers():
+    """Find a pending marker by task name. Returns marker data with 'path' or None.
+
+    Stops scanning (and reading marker files) at the first match.
+    """
+    for marker in _iter_pending_markers():
         if marker.get("pending_topic_name") == task_name:
             return marker
     return None
@@ -408,33 +435,40 @@ def scan_for_marker_files(search_paths: list[str] = None) -> list[dict]:
 
     Returns list of marker file contents with 'path' (directory) added.
     """
-    import subprocess
+    return list(iter_marker_files(search_paths))
+
+
+def iter_marker_files(search_paths: list[str] = None) -> Iterator[dict]:
+    """Lazily yield .claude/army.json marker contents with 'path' (directory) added.
 
+    All search paths are covered by a single find. Marker files are read one
+    at a time as they are consumed, so callers that stop early skip the
+    remaining reads.
+    """
     if search_paths is None:
         search_paths = [str(Path.home())]
+    if not search_paths:
+        return  # find with no paths would search the cwd
 
-    markers = []
-    for search_path in search_paths:
-        try:
-            # Find army.json files inside .claude directories
-            result = subprocess.run(
-                ["find", search_path, "-path", "*/.claude/army.json", "-type", "f"],
-                capture_output=True, text=True, timeout=30
-            )
-            for line in result.stdout.strip().split("\n"):
-                if not line:
-                    continue
-                # army.json is at /path/to/dir/.claude/army.json
-                # so directory is parent.parent
-                directory = str(Path(line).parent.parent)
-                marker_data = read_marker_file(directory)
-                if marker_data:
-                    marker_data["path"] = directory
-                    markers.append(marker_data)
-        except (subprocess.TimeoutExpired, Exception):
+    try:
+        # One find over all search paths; army.json files live inside .claude directories
+        result = subprocess.run(
+            ["find", *search_paths, "-path", "*/.claude/army.json", "-type", "f"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, timeout=30
+        )
+    except (subprocess.TimeoutExpired, Exception):
+        return
+
+    for line in result.stdout.strip().split("\n"):
+        if not line:
             continue
-
-    return markers
+        # army.json is at /path/to/dir/.claude/army.json
+        # so directory is parent.parent
+        directory = str(Path(line).parent.parent)
+        marker_data = read_marker_file(directory)
+        if marker_data:
+            marker_data["path"] = directory
+            yield marker_data
 
 
 # ============ Registry Recovery ============
@@ -10,6 +10,7 @@ import json
 import os
 import subprocess
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -106,10 +107,17 @@ def append_todo(directory: str, item: str) -> bool:
         return False
 
 
+@lru_cache(maxsize=8)
+def _read_telegram_config(path: str, mtime_ns: int, size: int) -> dict:
+    """Parse telegram config. Keyed by (path, mtime_ns, size) so edits invalidate."""
+    return json.loads(Path(path).read_text())
+
+
 def _get_bot_token() -> str:
-    """Get bot token from telegram config."""
-    tg_config = json.loads((Path.home() / "telegram.json").read_text())
-    return tg_config["bot_token"]
+    """Get bot token from telegram config (re-read only when the file changes)."""
+    path = Path.home() / "telegram.json"
+    st = path.stat()
+    return _read_telegram_config(str(path), st.st_mtime_ns, st.st_size)["bot_token"]
 
 
 def update_topic_status(topic_id: int, task_name: str, status: str):
@@ -13,9 +13,14 @@ Threading model:
 """
 
 import asyncio
+import json
+import random
+from collections import deque
 from typing import AsyncIterator
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from frontend_adapter import FrontendAdapter, IncomingMessage
 from registry import get_config, get_registry
@@ -24,6 +29,17 @@ from telegram_utils import (
     send_chat_action, delete_message as tg_delete_message
 )
 
+# Update types we handle; forum_topic_created arrives as a "message" update.
+# JSON-encoded because getUpdates takes it as a single query parameter.
+ALLOWED_UPDATES = json.dumps(["message", "callback_query"])
+
+# Poll retry backoff (seconds): doubles per consecutive failure, reset on success
+BACKOFF_INITIAL = 0.5
+BACKOFF_MAX = 30.0
+
+# Max updates per getUpdates call (Telegram's cap); a whole batch is drained before re-polling
+GET_UPDATES_LIMIT = 100
+
 
 class TelegramAdapter(FrontendAdapter):
     """Telegram implementation of FrontendAdapter.
@@ -35,15 +51,16 @@ class TelegramAdapter(FrontendAdapter):
     Polls Telegram API for updates and yields IncomingMessage objects.
     """
 
-    def __init__(self, bot_token: str, chat_id: str, timeout: int = 5):
+    def __init__(self, bot_token: str, chat_id: str, timeout: int = 20):
         """Initialize Telegram adapter.
 
         Args:
             bot_token: Telegram bot token
             chat_id: Telegram chat/group ID
-            timeout: Long polling timeout in seconds (must be >= 1)
+            timeout: Long polling timeout in seconds (integer, 0 = short polling).
+                Idle polls block server-side for this long instead of spinning.
         """
-        assert isinstance(timeout, int) and timeout >= 1
+        assert isinstance(timeout, int) and timeout >= 0
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.timeout = timeout
@@ -52,12 +69,25 @@ class TelegramAdapter(FrontendAdapter):
         config = get_config()
         self.offset = config.get("telegram_offset", 0)
 
-        # Session for connection pooling
+        # Session for connection pooling: one keep-alive pool for api.telegram.org,
+        # sized for the poller plus a few concurrent sends, with transient-error retries
         self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+        ))
 
         # Shutdown flag for clean exit
         self._shutdown = False
 
+        # Fetched but not yet yielded updates; survives a consumer closing the
+        # generator mid-batch, so the next incoming_messages() resumes without a poll
+        self._pending: deque[dict] = deque()
+
+        # Current poll retry delay (see _backoff_sleep)
+        self._backoff = BACKOFF_INITIAL
+
     def stop(self) -> None:
         """Signal the adapter to stop polling.
 
@@ -168,7 +198,8 @@ class TelegramAdapter(FrontendAdapter):
 
         target_chat_id = self.get_group_chat_id()
         log(f"send_message: chat_id={target_chat_id}, topic_id={topic_id}, task_id={task_id}")
-        response = send_to_topic(
+        response = await asyncio.to_thread(
+            send_to_topic,
             self.bot_token,
             target_chat_id,
             topic_id,
@@ -209,7 +240,8 @@ class TelegramAdapter(FrontendAdapter):
         # Support both list[dict] format and simple string label
         if isinstance(buttons, str):
             # Single disabled button with label
-            update_message_buttons(
+            await asyncio.to_thread(
+                update_message_buttons,
                 self.bot_token,
                 target_chat_id,
                 int(msg_id),
@@ -223,7 +255,8 @@ class TelegramAdapter(FrontendAdapter):
                      for btn in buttons]
                 ]
             }
-            self._session.post(
+            await asyncio.to_thread(
+                self._session.post,
                 f"https://api.telegram.org/bot{self.bot_token}/editMessageReplyMarkup",
                 json={
                     "chat_id": target_chat_id,
@@ -239,7 +272,7 @@ class TelegramAdapter(FrontendAdapter):
             task_id: Task identifier (unused, msg_id is global)
             msg_id: Message ID to delete
         """
-        tg_delete_message(self.bot_token, self.get_group_chat_id(), int(msg_id))
+        await asyncio.to_thread(tg_delete_message, self.bot_token, self.get_group_chat_id(), int(msg_id))
 
     async def show_typing(self, task_id: str):
         """Show typing indicator in Telegram topic.
@@ -249,7 +282,8 @@ class TelegramAdapter(FrontendAdapter):
         """
         topic_id = self._get_topic_id(task_id)
         if topic_id:
-            send_chat_action(
+            await asyncio.to_thread(
+                send_chat_action,
                 self.bot_token,
                 self.get_group_chat_id(),
                 action="typing",
@@ -269,71 +303,93 @@ class TelegramAdapter(FrontendAdapter):
 
         Note:
             Call stop() to signal shutdown. The generator will exit cleanly
-            after the current poll completes.
+            after the current poll completes, which can take up to
+            timeout + 5 seconds while a long poll is in flight.
         """
         while not self._shutdown:
             try:
-                # Poll Telegram API (in thread to avoid blocking event loop)
-                resp = await asyncio.to_thread(
-                    self._session.get,
-                    f"https://api.telegram.org/bot{self.bot_token}/getUpdates",
-                    params={"offset": self.offset, "timeout": self.timeout},
-                    timeout=self.timeout + 2
-                )
-
-                if self._shutdown:
-                    return
-
-                if not resp.ok:
-                    await asyncio.sleep(1)
-                    continue
+                if not self._pending:
+                    # Poll Telegram API (in thread to avoid blocking event loop)
+                    resp = await asyncio.to_thread(
+                        self._session.get,
+                        f"https://api.telegram.org/bot{self.bot_token}/getUpdates",
+                        params={
+                            "offset": self.offset,
+                            "timeout": self.timeout,
+                            "limit": GET_UPDATES_LIMIT,
+                            "allowed_updates": ALLOWED_UPDATES,
+                        },
+                        # Read timeout must outlast the server-side long poll
+                        timeout=self.timeout + 5
+                    )
 
-                updates = resp.json().get("result", [])
-
-                if updates:
-                    log(f"Got {len(updates)} Telegram updates")
-
-                for update in updates:
                     if self._shutdown:
                         return
 
-                    # Update offset for next poll
-                    self.offset = update["update_id"] + 1
-
-                    # Persist offset for crash recovery
-                    get_config().set("telegram_offset", self.offset)
-
-                    # Handle forum_topic_created events (store mapping)
-                    msg = update.get("message", {})
-                    if msg.get("forum_topic_created"):
-                        topic_id = msg.get("message_thread_id")
-                        name = msg["forum_topic_created"].get("name")
-                        if topic_id and name:
-                            get_config().store_topic_mapping(topic_id, name)
-                            log(f"Stored topic mapping: {topic_id} -> {name}")
+                    if not resp.ok:
+                        log(f"Telegram poll failed: HTTP {resp.status_code}")
+                        await self._backoff_sleep()
                         continue
 
-                    # Handle callback queries (button clicks)
-                    callback = update.get("callback_query")
-                    if callback:
-                        yield self._parse_callback(callback)
-                        continue
-
-                    # Handle regular messages
-                    if msg:
-                        incoming = self._parse_message(msg)
-                        if incoming:
-                            yield incoming
+                    updates = resp.json().get("result", [])
+                    self._backoff = BACKOFF_INITIAL
+
+                    if updates:
+                        log(f"Got {len(updates)} Telegram updates")
+                    self._pending.extend(updates)
+
+                batch_start_offset = self.offset
+                try:
+                    while self._pending:
+                        if self._shutdown:
+                            return
+
+                        update = self._pending.popleft()
+
+                        # Update offset for next poll
+                        self.offset = update["update_id"] + 1
+
+                        # Handle forum_topic_created events (store mapping)
+                        msg = update.get("message", {})
+                        if msg.get("forum_topic_created"):
+                            topic_id = msg.get("message_thread_id")
+                            name = msg["forum_topic_created"].get("name")
+                            if topic_id and name:
+                                get_config().store_topic_mapping(topic_id, name)
+                                log(f"Stored topic mapping: {topic_id} -> {name}")
+                            continue
+
+                        # Handle callback queries (button clicks)
+                        callback = update.get("callback_query")
+                        if callback:
+                            yield self._parse_callback(callback)
+                            continue
+
+                        # Handle regular messages
+                        if msg:
+                            incoming = self._parse_message(msg)
+                            if incoming:
+                                yield incoming
+                finally:
+                    # Persist offset for crash recovery once per batch (one config write,
+                    # also on early exit); a hard crash mid-batch redelivers the batch
+                    if self.offset != batch_start_offset:
+                        get_config().set("telegram_offset", self.offset)
 
             except asyncio.CancelledError:
                 log("Telegram poller cancelled")
                 return
             except requests.exceptions.RequestException as e:
                 log(f"Telegram poll error: {e}")
-                await asyncio.sleep(1)
+                await self._backoff_sleep()
             except Exception as e:
                 log(f"Unexpected error in incoming_messages: {e}")
-                await asyncio.sleep(1)
+                await self._backoff_sleep()
+
+    async def _backoff_sleep(self) -> None:
+        """Sleep the current backoff plus jitter, then double it (capped)."""
+        await asyncio.sleep(self._backoff + random.uniform(0, self._backoff / 2))
+        self._backoff = min(self._backoff * 2, BACKOFF_MAX)
 
     def _parse_message(self, msg: dict) -> IncomingMessage | None:
         """Parse a Telegram message into IncomingMessage.
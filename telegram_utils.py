@@ -6,7 +6,10 @@ import json
 import os
 import requests
 import shlex
+import tempfile
 import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -33,26 +36,68 @@ def log(msg: str):
     with _log_lock:
         print(f"[{ts}] {msg}", flush=True)
 
+HOME_PREFIX = str(Path.home()) + "/"
 CONFIG_FILE = Path.home() / "telegram.json"
 STATE_FILE = Path("/tmp/claude-telegram-state.json")
 
 
+@lru_cache(maxsize=8)
+def _parse_state(path: str, mtime_ns: int, size: int) -> dict:
+    """Parse the state file. Keyed by (path, mtime_ns, size) so writes invalidate."""
+    try:
+        return json.loads(Path(path).read_bytes())
+    except:
+        return {}
+
+
 class State:
-    """Persistent dict with auto-flush on modification."""
+    """Persistent dict with auto-flush on modification.
 
-    def __init__(self):
-        self._data = self._read()
+    Entries are shared with the parse cache: change them via update(), not in place.
+    """
+
+    def __init__(self, data: dict | None = None):
+        """Load STATE_FILE, or start from already-parsed data if given."""
+        self._data = self._read() if data is None else data
+        self._batch_depth = 0
+        self._dirty = False
 
     def _read(self) -> dict:
-        if not STATE_FILE.exists():
+        try:
+            st = STATE_FILE.stat()
+        except OSError:
             return {}
+        # Shallow copy is enough: add/remove touch only our dict, update() replaces entries
+        return dict(_parse_state(str(STATE_FILE), st.st_mtime_ns, st.st_size))
+
+    def _changed(self):
+        """Flush now, or at the end of the enclosing batch()."""
+        self._dirty = True
+        if not self._batch_depth:
+            self.flush()
+
+    def flush(self):
+        """Write to STATE_FILE atomically (write to temp, then rename)."""
+        fd, tmp_path = tempfile.mkstemp(dir=STATE_FILE.parent, suffix=".tmp")
         try:
-            return json.loads(STATE_FILE.read_text())
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self._data, f)
+            os.replace(tmp_path, STATE_FILE)
         except:
-            return {}
-
-    def _flush(self):
-        STATE_FILE.write_text(json.dumps(self._data))
+            os.unlink(tmp_path)
+            raise
+        self._dirty = False
+
+    @contextmanager
+    def batch(self):
+        """Coalesce modifications inside the block into a single flush."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self.flush()
 
     def get(self, msg_id: str) -> dict | None:
         """Get entry by message ID."""
@@ -70,19 +115,19 @@ class State:
     def add(self, msg_id: str, entry: dict):
         """Add entry and flush."""
         self._data[str(msg_id)] = entry
-        self._flush()
+        self._changed()
 
     def update(self, msg_id: str, **fields):
         """Update fields on entry and flush."""
         if str(msg_id) in self._data:
-            self._data[str(msg_id)].update(fields)
-            self._flush()
+            self._data[str(msg_id)] = {**self._data[str(msg_id)], **fields}
+            self._changed()
 
     def remove(self, msg_id: str):
         """Remove entry and flush."""
         if str(msg_id) in self._data:
             del self._data[str(msg_id)]
-            self._flush()
+            self._changed()
 
     @property
     def data(self) -> dict:
@@ -92,14 +137,16 @@ class State:
 
 def strip_home(path: str) -> str:
     """Remove home directory prefix from path."""
-    return path.removeprefix(str(Path.home()) + "/")
+    return path.removeprefix(HOME_PREFIX)
+
+
+_MDV1_ESCAPES = str.maketrans({c: '\\' + c for c in '\\_*`['})
+_MDV2_ESCAPES = str.maketrans({c: '\\' + c for c in '\\_*[]()~`>#+-=|{}.!'})
 
 
 def escape_markdown_v1(text: str) -> str:
     """Escape MarkdownV1 special chars in plain text."""
-    for char in ['\\', '_', '*', '`', '[']:
-        text = text.replace(char, '\\' + char)
-    return text
+    return text.translate(_MDV1_ESCAPES)
 
 
 def escape_markdown_v2(text: str) -> str:
@@ -108,11 +155,8 @@ def escape_markdown_v2(text: str) -> str:
     Use this for text that will appear OUTSIDE code blocks.
     Do NOT use on text that contains code blocks - escape pieces before assembly instead.
     """
-    # All MarkdownV2 special chars - backslash first to avoid double-escaping
-    special_chars = ['\\', '_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-    for char in special_chars:
-        text = text.replace(char, '\\' + char)
-    return text
+    # Single pass, so escaped backslashes are never escaped again
+    return text.translate(_MDV2_ESCAPES)
 
 
 def format_tool_permission(tool_name: str, tool_input: dict, markdown_v2: bool = False) -> str:
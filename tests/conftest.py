@@ -182,16 +182,16 @@ class MockClaudeSubprocess:
 
     @property
     def stdout(self):
-        """Mock stdout with readline()."""
+        """Mock stdout with read() (one queued line per call)."""
         mock = MagicMock()
-        mock.readline = self._stdout_readline
+        mock.read = self._stdout_read
         return mock
 
     @property
     def stderr(self):
-        """Mock stderr with readline()."""
+        """Mock stderr with read() (one queued line per call)."""
         mock = MagicMock()
-        mock.readline = self._stderr_readline
+        mock.read = self._stderr_read
         return mock
 
     def _stdin_write(self, data: bytes):
@@ -204,14 +204,14 @@ class MockClaudeSubprocess:
             except json.JSONDecodeError:
                 pass
 
-    async def _stdout_readline(self) -> bytes:
+    async def _stdout_read(self, n: int = -1) -> bytes:
         """Return next event as JSONL."""
         try:
             return await asyncio.wait_for(self._stdout_queue.get(), timeout=0.1)
         except asyncio.TimeoutError:
             return b""
 
-    async def _stderr_readline(self) -> bytes:
+    async def _stderr_read(self, n: int = -1) -> bytes:
         """Return stderr (empty for mock)."""
         try:
             return await asyncio.wait_for(self._stderr_queue.get(), timeout=0.1)
@@ -267,6 +267,7 @@ class MockTelegramServer:
         self.callback_answers: list[dict] = []
         self.edited_messages: list[dict] = []
         self.deleted_messages: list[int] = []
+        self.get_updates_calls: list[dict] = []
         self.update_id_counter = 1
         self.message_id_counter = 100
 
@@ -395,9 +396,11 @@ class MockTelegramServer:
                 self.do_POST()
 
             def _handle_get_updates(self, data: dict) -> dict:
+                server.get_updates_calls.append(data)
                 offset = data.get("offset", 0)
-                # Return updates with update_id >= offset
+                # Return updates with update_id >= offset, capped at limit (Telegram default 100)
                 updates = [u for u in server.pending_updates if u["update_id"] >= offset]
+                updates = updates[:data.get("limit", 100)]
                 # Clear returned updates
                 server.pending_updates = [u for u in server.pending_updates if u["update_id"] < offset]
                 return {"ok": True, "result": updates}
@@ -663,7 +666,8 @@ def telegram_adapter_with_mock(mock_telegram_server, mock_telegram_config):
     import requests
     from telegram_adapter import TelegramAdapter
 
-    adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
+    # timeout=0 short-polls the mock server so tests never sit in a long poll
+    adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=0)
 
     original_get = adapter._session.get
 
@@ -3,9 +3,10 @@
 import asyncio
 import json
 import sys
+from types import SimpleNamespace
 
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
 from claude_process import (
     AssistantMessage,
@@ -553,6 +554,7 @@ class TestClaudeProcessErrorPaths:
         async def emit_invalid_json():
             await mock_proc._stdout_queue.put(b"not valid json\n")
             await mock_proc._stdout_queue.put(b"{invalid: json}\n")
+            await mock_proc._stdout_queue.put(b'{"type": "\xff"}\n')  # Invalid UTF-8
             line = json.dumps(SYSTEM_INIT_EVENT) + "\n"
             await mock_proc._stdout_queue.put(line.encode('utf-8'))
             await asyncio.sleep(0.05)
@@ -578,14 +580,14 @@ class TestClaudeProcessErrorPaths:
         mock_proc = MockClaudeSubprocess(events=[])
 
         call_count = 0
-        async def failing_readline():
+        async def failing_read(n=-1):
             nonlocal call_count
             call_count += 1
             if call_count == 1:
                 raise RuntimeError("Simulated read error")
             return b""
 
-        mock_proc.stdout.readline = failing_readline
+        mock_proc._stdout_read = failing_read
 
         with patch("asyncio.create_subprocess_exec", return_value=mock_proc):
             process = ClaudeProcess(cwd=temp_dir)
@@ -594,6 +596,31 @@ class TestClaudeProcessErrorPaths:
             with pytest.raises((asyncio.TimeoutError, RuntimeError)):
                 await asyncio.wait_for(process.start(), timeout=1.0)
 
+    async def test_read_stdout_line_longer_than_stream_limit(self, temp_dir):
+        """Test lines over the StreamReader limit are read whole, not dropped."""
+        text = "x" * 200_000
+        big = {"type": "assistant", "message": {"content": [{"type": "text", "text": text}]}}
+        reader = asyncio.StreamReader()  # Default 64 KiB limit
+        reader.feed_data((json.dumps(big) + "\n" + json.dumps(SYSTEM_INIT_EVENT) + "\n").encode())
+        reader.feed_eof()
+
+        process = ClaudeProcess(cwd=temp_dir)
+        process.process = SimpleNamespace(stdout=reader)
+        process._running = True
+        await process._read_stdout()
+
+        events = [process._event_queue.get_nowait() for _ in range(3)]
+        assert isinstance(events[0], AssistantMessage)
+        assert events[0].content[0]["text"] == text
+        assert isinstance(events[1], SystemInit)
+        assert events[2] is None
+
+    async def test_iter_lines_joins_lines_across_reads(self):
+        """Test lines split across reads are rejoined and an unterminated tail is kept."""
+        reader = SimpleNamespace(read=AsyncMock(side_effect=[b"a\nb", b"c", b"d\n\ne\nf", b""]))
+        lines = [line async for line in ClaudeProcess._iter_lines(reader)]
+        assert lines == [b"a", b"bcd", b"", b"e", b"f"]
+
     async def test_read_stderr_no_process(self, temp_dir):
         """Test _read_stderr returns early when no process."""
         process = ClaudeProcess(cwd=temp_dir)
@@ -628,10 +655,10 @@ class TestClaudeProcessErrorPaths:
         """Test _read_stderr handles exception."""
         mock_proc = MockClaudeSubprocess(events=[SYSTEM_INIT_EVENT])
 
-        async def failing_stderr_readline():
+        async def failing_stderr_read(n=-1):
             raise RuntimeError("Simulated stderr read error")
 
-        mock_proc._stderr_readline = failing_stderr_readline
+        mock_proc._stderr_read = failing_stderr_read
 
         with patch("asyncio.create_subprocess_exec", return_value=mock_proc), \
              patch("claude_process.log") as mock_log:
@@ -1,9 +1,11 @@
 """Tests for daemon_core.py - singleton management and PID file handling."""
 
+import asyncio
 import atexit
 import os
 import signal
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock, AsyncMock
 
 import pytest
@@ -16,6 +18,17 @@ from daemon_core import (
 )
 
 
+def _registry_stub(topic_id):
+    """Lightweight registry double exposing only get_topic_for_session."""
+    return SimpleNamespace(get_topic_for_session=lambda session_id: topic_id)
+
+
+@pytest.fixture
+def daemon():
+    """Fresh Daemon per test (its asyncio queues bind to the test's event loop)."""
+    return Daemon("test_token", "123456789")
+
+
 class TestCleanupPidFile:
     """Test cleanup_pid_file function."""
 
@@ -135,7 +148,7 @@ class TestDrainInitTurn:
         return process
 
     @pytest.mark.asyncio
-    async def test_drain_init_turn_consumes_events_until_session_result(self, mock_claude_process):
+    async def test_drain_init_turn_consumes_events_until_session_result(self, mock_claude_process, daemon):
         from daemon_core import Daemon
         from claude_process import SystemInit, AssistantMessage, SessionResult
 
@@ -150,13 +163,12 @@ class TestDrainInitTurn:
         await mock_claude_process._event_queue.put(assistant_event)
         await mock_claude_process._event_queue.put(result_event)
 
-        daemon = Daemon("test_token", "123456789")
         await daemon._drain_init_turn(mock_claude_process)
 
         assert mock_claude_process._event_queue.empty()
 
     @pytest.mark.asyncio
-    async def test_drain_init_turn_stops_at_session_result(self, mock_claude_process):
+    async def test_drain_init_turn_stops_at_session_result(self, mock_claude_process, daemon):
         from daemon_core import Daemon
         from claude_process import SystemInit, AssistantMessage, SessionResult
 
@@ -176,7 +188,6 @@ class TestDrainInitTurn:
         await mock_claude_process._event_queue.put(init_result)
         await mock_claude_process._event_queue.put(subsequent_event)
 
-        daemon = Daemon("test_token", "123456789")
         await daemon._drain_init_turn(mock_claude_process)
 
         assert not mock_claude_process._event_queue.empty()
@@ -185,7 +196,7 @@ class TestDrainInitTurn:
         assert remaining.msg_id == "msg_user"
 
     @pytest.mark.asyncio
-    async def test_drain_init_turn_handles_process_end(self, mock_claude_process):
+    async def test_drain_init_turn_handles_process_end(self, mock_claude_process, daemon):
         from daemon_core import Daemon
         from claude_process import SystemInit
 
@@ -193,7 +204,6 @@ class TestDrainInitTurn:
         await mock_claude_process._event_queue.put(init_event)
         await mock_claude_process._event_queue.put(None)
 
-        daemon = Daemon("test_token", "123456789")
         await daemon._drain_init_turn(mock_claude_process)
 
 
@@ -210,7 +220,7 @@ class TestRouteMessageResurrection:
         return pm
 
     @pytest.mark.asyncio
-    async def test_route_message_calls_send_to_process_without_existing_process(self, mock_process_manager):
+    async def test_route_message_calls_send_to_process_without_existing_process(self, mock_process_manager, daemon):
         """Test that routing calls send_to_process even when no process exists in memory.
 
         Bug fix: Previously, _route_message_to_claude checked get_process() first and
@@ -218,7 +228,6 @@ class TestRouteMessageResurrection:
         of tasks from the registry. Now it calls send_to_process unconditionally,
         which handles resurrection internally.
         """
-        daemon = Daemon("test_token", "123456789")
         daemon.process_manager = mock_process_manager
 
         # No process exists in memory
@@ -231,13 +240,12 @@ class TestRouteMessageResurrection:
         mock_process_manager.send_to_process.assert_called_once_with("my_task", "Hello from user")
 
     @pytest.mark.asyncio
-    async def test_route_message_falls_back_to_operator_on_keyerror(self, mock_process_manager):
+    async def test_route_message_falls_back_to_operator_on_keyerror(self, mock_process_manager, daemon):
         """Test that routing falls back to operator when task not found in registry.
 
         When send_to_process raises KeyError (task not in registry), we should
         fall back to routing the message to the operator.
         """
-        daemon = Daemon("test_token", "123456789")
         daemon.process_manager = mock_process_manager
 
         # First call (to task) raises KeyError, second call (to operator) succeeds
@@ -252,9 +260,8 @@ class TestRouteMessageResurrection:
         assert calls[1].args == ("operator", "Hello")
 
     @pytest.mark.asyncio
-    async def test_route_message_operator_direct(self, mock_process_manager):
+    async def test_route_message_operator_direct(self, mock_process_manager, daemon):
         """Test that messages to operator go directly without task lookup."""
-        daemon = Daemon("test_token", "123456789")
         daemon.process_manager = mock_process_manager
 
         await daemon._route_message_to_claude("operator", "Hello operator")
@@ -263,9 +270,8 @@ class TestRouteMessageResurrection:
         mock_process_manager.send_to_process.assert_called_once_with("operator", "Hello operator")
 
     @pytest.mark.asyncio
-    async def test_route_message_does_not_retry_on_success(self, mock_process_manager):
+    async def test_route_message_does_not_retry_on_success(self, mock_process_manager, daemon):
         """Test that successful routing doesn't fall back to operator."""
-        daemon = Daemon("test_token", "123456789")
         daemon.process_manager = mock_process_manager
 
         # send_to_process succeeds for task
@@ -388,7 +394,7 @@ class TestOnSystemInit:
     """Test _on_system_init updates registry with session tracking."""
 
     @pytest.mark.asyncio
-    async def test_on_system_init_updates_registry(self):
+    async def test_on_system_init_updates_registry(self, daemon):
         """Test that _on_system_init calls registry.update_task_session_tracking.
 
         Bug fix: When a process emits SystemInit, we need to update the registry
@@ -397,7 +403,6 @@ class TestOnSystemInit:
         """
         from claude_process import SystemInit
 
-        daemon = Daemon("test_token", "123456789")
 
         # Create a mock registry
         mock_registry = MagicMock()
@@ -421,11 +426,10 @@ class TestOnSystemInit:
         )
 
     @pytest.mark.asyncio
-    async def test_on_system_init_logs_event(self):
+    async def test_on_system_init_logs_event(self, daemon):
         """Test that _on_system_init logs the system init event."""
         from claude_process import SystemInit
 
-        daemon = Daemon("test_token", "123456789")
 
         init_event = SystemInit(
             session_id="session-xyz789",
@@ -451,15 +455,13 @@ class TestProcessPermissionRequest:
     """Test _process_permission_request method."""
 
     @pytest.mark.asyncio
-    async def test_process_permission_request_sends_notification(self):
+    async def test_process_permission_request_sends_notification(self, monkeypatch, daemon):
         """Test _process_permission_request sends Telegram notification."""
         from permission_server import PendingPermission
 
-        daemon = Daemon("test_token", "123456789")
 
-        # Setup mock registry
-        mock_registry = MagicMock()
-        mock_registry.get_topic_for_session = MagicMock(return_value=12345)
+        # Registry stub: session -> topic lookup only
+        monkeypatch.setattr("daemon_core.get_registry", lambda: _registry_stub(12345))
 
         # Add pending permission
         pending = PendingPermission(
@@ -471,8 +473,7 @@ class TestProcessPermissionRequest:
         )
         daemon.permission_manager.pending["toolu_process_test"] = pending
 
-        with patch("daemon_core.get_registry", return_value=mock_registry), \
-             patch("daemon_core.send_permission_notification") as mock_send:
+        with patch("daemon_core.send_permission_notification") as mock_send:
             await daemon._process_permission_request("toolu_process_test", "session-123")
 
             # Uses telegram.get_group_chat_id() which returns config.group_id or chat_id
@@ -486,15 +487,13 @@ class TestProcessPermissionRequest:
             )
 
     @pytest.mark.asyncio
-    async def test_process_permission_request_skips_if_no_topic(self):
+    async def test_process_permission_request_skips_if_no_topic(self, monkeypatch, daemon):
         """Test _process_permission_request skips if no topic found."""
         from permission_server import PendingPermission
 
-        daemon = Daemon("test_token", "123456789")
 
-        # Setup mock registry that returns no topic
-        mock_registry = MagicMock()
-        mock_registry.get_topic_for_session = MagicMock(return_value=None)
+        # Registry stub: session -> topic lookup only
+        monkeypatch.setattr("daemon_core.get_registry", lambda: _registry_stub(None))
 
         # Add pending permission
         pending = PendingPermission(
@@ -506,8 +505,7 @@ class TestProcessPermissionRequest:
         )
         daemon.permission_manager.pending["toolu_no_topic"] = pending
 
-        with patch("daemon_core.get_registry", return_value=mock_registry), \
-             patch("daemon_core.send_permission_notification") as mock_send, \
+        with patch("daemon_core.send_permission_notification") as mock_send, \
              patch("daemon_core.log"):
             await daemon._process_permission_request("toolu_no_topic", "unknown-session")
 
@@ -515,32 +513,27 @@ class TestProcessPermissionRequest:
             mock_send.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_process_permission_request_skips_if_already_resolved(self):
+    async def test_process_permission_request_skips_if_already_resolved(self, monkeypatch, daemon):
         """Test _process_permission_request skips if permission already resolved."""
-        daemon = Daemon("test_token", "123456789")
 
-        # Setup mock registry
-        mock_registry = MagicMock()
-        mock_registry.get_topic_for_session = MagicMock(return_value=12345)
+        # Registry stub: session -> topic lookup only
+        monkeypatch.setattr("daemon_core.get_registry", lambda: _registry_stub(12345))
 
         # No pending permission (already resolved)
-        with patch("daemon_core.get_registry", return_value=mock_registry), \
-             patch("daemon_core.send_permission_notification") as mock_send:
+        with patch("daemon_core.send_permission_notification") as mock_send:
             await daemon._process_permission_request("toolu_resolved", "session-123")
 
             # Should not send notification
             mock_send.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_process_permission_request_skips_if_already_notified(self):
+    async def test_process_permission_request_skips_if_already_notified(self, monkeypatch, daemon):
         """Test _process_permission_request skips if already notified."""
         from permission_server import PendingPermission
 
-        daemon = Daemon("test_token", "123456789")
 
-        # Setup mock registry
-        mock_registry = MagicMock()
-        mock_registry.get_topic_for_session = MagicMock(return_value=12345)
+        # Registry stub: session -> topic lookup only
+        monkeypatch.setattr("daemon_core.get_registry", lambda: _registry_stub(12345))
 
         # Add pending permission with telegram_msg_id already set
         pending = PendingPermission(
@@ -553,8 +546,7 @@ class TestProcessPermissionRequest:
         pending.telegram_msg_id = 999  # Already notified
         daemon.permission_manager.pending["toolu_already_notified"] = pending
 
-        with patch("daemon_core.get_registry", return_value=mock_registry), \
-             patch("daemon_core.send_permission_notification") as mock_send:
+        with patch("daemon_core.send_permission_notification") as mock_send:
             await daemon._process_permission_request("toolu_already_notified", "session-123")
 
             # Should not send notification again
@@ -565,18 +557,16 @@ class TestHandlePermissionRequestsAsyncIterator:
     """Test _handle_permission_requests with async iterator."""
 
     @pytest.mark.asyncio
-    async def test_handle_permission_requests_processes_queue(self):
+    async def test_handle_permission_requests_processes_queue(self, monkeypatch, daemon):
         """Test _handle_permission_requests processes items from queue."""
         import asyncio
         from permission_server import PendingPermission
 
-        daemon = Daemon("test_token", "123456789")
         loop = asyncio.get_running_loop()
         daemon.permission_manager.set_event_loop(loop)
 
-        # Setup mock registry
-        mock_registry = MagicMock()
-        mock_registry.get_topic_for_session = MagicMock(return_value=12345)
+        # Registry stub: session -> topic lookup only
+        monkeypatch.setattr("daemon_core.get_registry", lambda: _registry_stub(12345))
 
         # Add pending permission
         pending = PendingPermission(
@@ -595,18 +585,16 @@ class TestHandlePermissionRequestsAsyncIterator:
         # Queue shutdown sentinel
         daemon.permission_manager._notification_queue.put_nowait(None)
 
-        with patch("daemon_core.get_registry", return_value=mock_registry), \
-             patch("daemon_core.send_permission_notification") as mock_send:
+        with patch("daemon_core.send_permission_notification") as mock_send:
             await daemon._handle_permission_requests()
 
             mock_send.assert_called_once()
 
     @pytest.mark.asyncio
-    async def test_handle_permission_requests_handles_exceptions(self):
+    async def test_handle_permission_requests_handles_exceptions(self, monkeypatch, daemon):
         """Test _handle_permission_requests continues on exception."""
         import asyncio
 
-        daemon = Daemon("test_token", "123456789")
         loop = asyncio.get_running_loop()
         daemon.permission_manager.set_event_loop(loop)
 
@@ -616,12 +604,16 @@ class TestHandlePermissionRequestsAsyncIterator:
         )
         daemon.permission_manager._notification_queue.put_nowait(None)
 
-        # Mock registry to raise exception
-        mock_registry = MagicMock()
-        mock_registry.get_topic_for_session = MagicMock(side_effect=Exception("Test error"))
+        # Registry stub that raises on lookup
+        def failing_lookup(session_id):
+            raise Exception("Test error")
 
-        with patch("daemon_core.get_registry", return_value=mock_registry), \
-             patch("daemon_core.log"):
+        monkeypatch.setattr(
+            "daemon_core.get_registry",
+            lambda: SimpleNamespace(get_topic_for_session=failing_lookup)
+        )
+
+        with patch("daemon_core.log"):
             # Should not raise
             await daemon._handle_permission_requests()
 
@@ -643,13 +635,12 @@ class TestShowTypingBeforeRouting:
         return pm
 
     @pytest.mark.asyncio
-    async def test_show_typing_called_for_correct_task_id(self, mock_frontend, mock_process_manager):
+    async def test_show_typing_called_for_correct_task_id(self, mock_frontend, mock_process_manager, daemon):
         """Test that show_typing() is called with the correct task_id.
 
         When a user sends a message to a task, show_typing() should be called
         with that task_id to indicate the bot is processing the message.
         """
-        daemon = Daemon("test_token", "123456789")
         daemon.telegram = mock_frontend
         daemon.process_manager = mock_process_manager
 
@@ -673,7 +664,7 @@ class TestShowTypingBeforeRouting:
         assert mock_frontend.typing_shown[0] == "my_task"
 
     @pytest.mark.asyncio
-    async def test_show_typing_called_before_route_message(self, mock_frontend, mock_process_manager):
+    async def test_show_typing_called_before_route_message(self, mock_frontend, mock_process_manager, daemon):
         """Test that show_typing() is called BEFORE _route_message_to_claude().
 
         The typing indicator should appear before the message is routed to Claude,
@@ -681,7 +672,6 @@ class TestShowTypingBeforeRouting:
         """
         call_order = []
 
-        daemon = Daemon("test_token", "123456789")
         daemon.process_manager = mock_process_manager
 
         # Track call order
@@ -709,9 +699,8 @@ class TestShowTypingBeforeRouting:
         assert call_order[1] == ("send_to_process", "test_task")
 
     @pytest.mark.asyncio
-    async def test_show_typing_called_for_operator_task(self, mock_frontend, mock_process_manager):
+    async def test_show_typing_called_for_operator_task(self, mock_frontend, mock_process_manager, daemon):
         """Test show_typing() is called for operator task."""
-        daemon = Daemon("test_token", "123456789")
         daemon.telegram = mock_frontend
         daemon.process_manager = mock_process_manager
 
@@ -719,3 +708,115 @@ class TestShowTypingBeforeRouting:
         await daemon._route_message_to_claude("operator", "Hello")
 
         assert "operator" in mock_frontend.typing_shown
+
+
+class TestTelegramMessageQueue:
+    """Test Telegram messages are queued and handled by per-task workers."""
+
+    @pytest.mark.asyncio
+    async def test_slow_task_does_not_block_other_tasks(self, daemon):
+        """Test a task stuck in send_to_process does not delay messages for other tasks."""
+        from conftest import MockFrontendAdapter
+
+        daemon.telegram = MockFrontendAdapter()
+
+        slow_release = asyncio.Event()
+        routed = []
+        fast_routed = asyncio.Event()
+
+        async def send_to_process(task_id, text):
+            if task_id == "slow_task":
+                await slow_release.wait()
+            routed.append((task_id, text))
+            if task_id == "fast_task":
+                fast_routed.set()
+            return True
+
+        daemon.process_manager = MagicMock()
+        daemon.process_manager.send_to_process = send_to_process
+
+        daemon.telegram.add_incoming_message("slow_task", text="first")
+        daemon.telegram.add_incoming_message("fast_task", text="second")
+
+        tasks = [
+            asyncio.create_task(daemon._handle_telegram_messages()),
+            asyncio.create_task(daemon._dispatch_telegram_messages()),
+        ]
+        try:
+            await asyncio.wait_for(fast_routed.wait(), timeout=1.0)
+            assert routed == [("fast_task", "second")]
+
+            slow_release.set()
+            for _ in range(10):
+                if len(routed) == 2:
+                    break
+                await asyncio.sleep(0)
+            assert routed[1] == ("slow_task", "first")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert daemon._task_workers == {}
+
+    @pytest.mark.asyncio
+    async def test_idle_worker_exits(self, daemon):
+        """Test a task's worker and queue are dropped once drained, and recreated on demand."""
+        daemon.telegram = MagicMock()
+        handled = []
+
+        async def handle(msg):
+            handled.append(msg)
+
+        daemon._handle_telegram_message = handle
+        dispatcher = asyncio.create_task(daemon._dispatch_telegram_messages())
+        try:
+            for i in range(2):
+                await daemon._telegram_queue.put(SimpleNamespace(task_id="task_a", n=i))
+                for _ in range(10):
+                    await asyncio.sleep(0)
+                assert len(handled) == i + 1
+                assert daemon._task_workers == {}
+                assert daemon._task_queues == {}
+        finally:
+            dispatcher.cancel()
+            await asyncio.gather(dispatcher, return_exceptions=True)
+
+    def test_queue_is_bounded(self, daemon):
+        """Test the poller queue applies backpressure instead of growing unbounded."""
+        from daemon_core import TELEGRAM_QUEUE_SIZE
+
+        assert daemon._telegram_queue.maxsize == TELEGRAM_QUEUE_SIZE
+
+
+class TestReplyContext:
+    """Test reply context is prepended only for real replies."""
+
+    @staticmethod
+    def _msg(reply_to_message):
+        from frontend_adapter import IncomingMessage
+        return IncomingMessage(
+            task_id="my_task", text="hi", callback_data=None, msg_id="50",
+            reply_to_msg_id=None, reply_to_message=reply_to_message
+        )
+
+    def test_no_reply(self):
+        """Test plain messages are passed through."""
+        assert Daemon._with_reply_context(self._msg(None)) == "hi"
+
+    def test_topic_root_reply_skipped(self):
+        """Test implicit replies to the topic root add no context."""
+        root = {"message_id": 7, "message_thread_id": 7, "text": "topic"}
+        assert Daemon._with_reply_context(self._msg(root)) == "hi"
+
+    def test_reply_without_text_skipped(self):
+        """Test replies to messages without text add no context."""
+        reply = {"message_id": 8, "message_thread_id": 7}
+        assert Daemon._with_reply_context(self._msg(reply)) == "hi"
+
+    def test_reply_includes_context(self):
+        """Test replies to text messages include the quoted message and ids."""
+        reply = {"message_id": 8, "message_thread_id": 7, "text": "earlier", "from": {"first_name": "Bot"}}
+        assert Daemon._with_reply_context(self._msg(reply)) == (
+            "[Replying to msg_id=8 topic=7 from=Bot]\nearlier\n\n[msg_id=50]\nhi"
+        )
@@ -167,6 +167,28 @@ class TestPermissionManagerInteractive:
         decision, reason = result_queue.get(timeout=1.0)
         assert decision == "allow"
 
+    def test_response_drops_only_own_msg_mapping(self, permission_manager):
+        """Test cleanup removes the answered msg_id and leaves other mappings intact."""
+        for i in range(1000):
+            permission_manager._msg_to_tool[i] = f"toolu_other_{i}"
+
+        thread = threading.Thread(target=permission_manager.request_permission, kwargs=dict(
+            tool_name="Bash",
+            tool_input={"command": "ls"},
+            tool_use_id="toolu_cleanup_001",
+            session_id="session-abc",
+            cwd="/home/user",
+        ))
+        thread.start()
+
+        assert wait_for_pending(permission_manager, "toolu_cleanup_001")
+        permission_manager.register_telegram_msg("toolu_cleanup_001", msg_id=5000)
+        permission_manager.respond_by_msg_id(5000, "allow")
+        thread.join(timeout=1.0)
+
+        assert 5000 not in permission_manager._msg_to_tool
+        assert len(permission_manager._msg_to_tool) == 1000
+
 
 class TestPermissionHookHTTP:
     """Test permission hook HTTP request/response flow."""
@@ -200,6 +200,26 @@ class TestConfig:
             assert config.get_topic_name(123) == "test_topic"
             assert config.get_topic_name(999) is None
 
+    def test_config_topic_mapping_bounded(self, temp_dir):
+        """Test topic mappings keep only the most recently stored entries."""
+        from registry import Config, reset_singletons
+        reset_singletons()
+
+        config_path = Path(temp_dir) / "config.json"
+        with patch("registry.CONFIG_FILE", config_path), \
+             patch("registry.CLAUDE_ARMY_DIR", Path(temp_dir)), \
+             patch("registry.TOPIC_MAPPINGS_MAX", 3):
+
+            config = Config()
+            for topic_id in (1, 2, 3):
+                config.store_topic_mapping(topic_id, f"t{topic_id}")
+            config.store_topic_mapping(1, "t1-renamed")  # Refreshes 1
+            config.store_topic_mapping(4, "t4")  # Evicts 2, the oldest
+
+            assert config.get_topic_name(2) is None
+            assert config.get_topic_name(1) == "t1-renamed"
+            assert list(Config().get("topic_mappings")) == ["3", "1", "4"]
+
     def test_config_clear(self, temp_dir):
         """Test config clear."""
         from registry import Config, reset_singletons
@@ -398,6 +418,25 @@ class TestReloadableJSONMaybeReload:
 
             assert config.get("key") == "modified"
 
+    def test_maybe_reload_unchanged_is_one_stat(self, tmp_path):
+        """Test an unchanged file costs a single stat and no read per access."""
+        from registry import Config, reset_singletons
+        reset_singletons()
+
+        config_path = tmp_path / "config.json"
+        config_path.write_text('{"key": "value"}')
+
+        with patch("registry.CONFIG_FILE", config_path), \
+             patch("registry.CLAUDE_ARMY_DIR", tmp_path):
+            config = Config()
+            with patch.object(Path, "stat", autospec=True, side_effect=Path.stat) as stat, \
+                 patch.object(Path, "exists", autospec=True, side_effect=Path.exists) as exists, \
+                 patch("registry._read_json") as read:
+                assert config.get("key") == "value"
+            assert stat.call_count == 1
+            exists.assert_not_called()
+            read.assert_not_called()
+
     def test_maybe_reload_handles_oserror(self, tmp_path):
         """Test _maybe_reload handles OSError gracefully."""
         from registry import Config, reset_singletons
@@ -657,6 +696,23 @@ class TestPendingMarkerFunctions:
         assert found["path"] == str(directory)
         assert not_found is None
 
+    def test_find_pending_marker_by_name_stops_at_match(self):
+        """Test find_pending_marker_by_name stops consuming markers after a match."""
+        from registry import find_pending_marker_by_name
+
+        consumed = []
+
+        def fake_markers():
+            for name in ["a", "target", "b", "c"]:
+                consumed.append(name)
+                yield {"pending_topic_name": name, "path": f"/tmp/{name}"}
+
+        with patch("registry.iter_marker_files", return_value=fake_markers()):
+            found = find_pending_marker_by_name("target")
+
+        assert found["path"] == "/tmp/target"
+        assert consumed == ["a", "target"]
+
 
 class TestScanForMarkerFiles:
     """Test scan_for_marker_files function."""
@@ -683,6 +739,32 @@ class TestScanForMarkerFiles:
         for m in markers:
             assert "path" in m
 
+    def test_scan_for_marker_files_multiple_paths_one_find(self, tmp_path):
+        """Test several search paths are scanned by a single find, missing ones skipped."""
+        from registry import write_marker_file, scan_for_marker_files
+        import subprocess
+
+        proj1 = tmp_path / "a" / "project1"
+        proj2 = tmp_path / "b" / "project2"
+        proj1.mkdir(parents=True)
+        proj2.mkdir(parents=True)
+        write_marker_file(str(proj1), {"name": "task1"})
+        write_marker_file(str(proj2), {"name": "task2"})
+
+        paths = [str(tmp_path / "a"), str(tmp_path / "missing"), str(tmp_path / "b")]
+        with patch("subprocess.run", wraps=subprocess.run) as run:
+            markers = scan_for_marker_files(paths)
+        assert run.call_count == 1
+        assert sorted(m["name"] for m in markers) == ["task1", "task2"]
+
+    def test_scan_for_marker_files_no_paths(self):
+        """Test an empty search path list scans nothing."""
+        from registry import scan_for_marker_files
+
+        with patch("subprocess.run") as run:
+            assert scan_for_marker_files([]) == []
+        run.assert_not_called()
+
     def test_scan_for_marker_files_empty(self, tmp_path):
         """Test scan_for_marker_files with no markers."""
         from registry import scan_for_marker_files
@@ -7,7 +7,8 @@ import pytest
 
 from session_worker import (
     get_worktree_path, get_worker_pane_for_topic, get_worker_process_for_topic,
-    is_worker_pane, is_worker_process, create_claude_local_md, append_todo
+    is_worker_pane, is_worker_process, create_claude_local_md, append_todo,
+    _get_bot_token, _read_telegram_config
 )
 
 
@@ -35,6 +36,39 @@ class TestWorktreePath:
         assert isinstance(result, Path)
 
 
+# =============================================================================
+# Bot Token Tests
+# =============================================================================
+
+
+class TestBotToken:
+    """Tests for cached telegram config reads."""
+
+    def test_get_bot_token_reads_file_once(self, tmp_path):
+        """Test repeated calls parse telegram.json only once while unchanged."""
+        (tmp_path / "telegram.json").write_text('{"bot_token": "TOKEN1"}')
+        _read_telegram_config.cache_clear()
+
+        with patch("session_worker.Path.home", return_value=tmp_path):
+            assert _get_bot_token() == "TOKEN1"
+            assert _get_bot_token() == "TOKEN1"
+
+        info = _read_telegram_config.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
+    def test_get_bot_token_rereads_on_change(self, tmp_path):
+        """Test a modified telegram.json is picked up."""
+        config_file = tmp_path / "telegram.json"
+        config_file.write_text('{"bot_token": "TOKEN1"}')
+        _read_telegram_config.cache_clear()
+
+        with patch("session_worker.Path.home", return_value=tmp_path):
+            assert _get_bot_token() == "TOKEN1"
+            config_file.write_text('{"bot_token": "TOKEN22"}')  # size differs even if mtime doesn't
+            assert _get_bot_token() == "TOKEN22"
+
+
 # =============================================================================
 # Worker Process Lookup Tests
 # =============================================================================
@@ -1,10 +1,14 @@
 """Tests for telegram_adapter.py - TelegramAdapter messaging."""
 
 import asyncio
+import json
+import threading
+from collections import deque
 import pytest
 from unittest.mock import MagicMock, patch
 
 import requests
+from requests.adapters import HTTPAdapter
 
 
 class TestTelegramAdapterShutdown:
@@ -37,6 +41,26 @@ class TestTelegramAdapterShutdown:
             assert adapter._shutdown is False
 
 
+class TestTelegramAdapterSession:
+    """Test TelegramAdapter HTTP session setup."""
+
+    def test_session_has_pooled_adapter(self):
+        """Test the session mounts a pooled, retrying adapter for the Telegram API."""
+        with patch("telegram_adapter.get_config") as mock_config:
+            mock_cfg = MagicMock()
+            mock_cfg.get.return_value = 0
+            mock_config.return_value = mock_cfg
+
+            from telegram_adapter import TelegramAdapter
+            adapter = TelegramAdapter("TOKEN", "CHAT", timeout=1)
+
+            http_adapter = adapter._session.get_adapter("https://api.telegram.org")
+            assert isinstance(http_adapter, HTTPAdapter)
+            assert http_adapter._pool_maxsize >= 4
+            assert http_adapter.max_retries.total == 3
+            adapter.stop()
+
+
 class TestMockTelegramServer:
     """Test mock Telegram server behaves correctly."""
 
@@ -198,316 +222,189 @@ class TestTelegramAdapterIntegration:
                 assert "message_thread_id" not in sent or sent.get("message_thread_id") == 1
 
 
+@pytest.fixture(scope="class")
+def shared_adapter(request):
+    """One TelegramAdapter per test class; registry/config mocks are reset per test."""
+    mock_reg_instance = MagicMock()
+    mock_cfg_instance = MagicMock()
+    with patch("telegram_adapter.get_registry", return_value=mock_reg_instance), \
+         patch("telegram_adapter.get_config", return_value=mock_cfg_instance):
+
+        from telegram_adapter import TelegramAdapter
+
+        adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
+        request.cls.adapter = adapter
+        request.cls.mock_reg = mock_reg_instance
+        request.cls.mock_cfg = mock_cfg_instance
+        yield adapter
+        adapter.stop()
+
+
+def _redirect_to_mock_server(post, server):
+    """Wrap a post function so Telegram API calls hit the mock server."""
+    def patched_post(url, **kwargs):
+        if "api.telegram.org" in url:
+            method = url.split("/")[-1]
+            return post(f"{server.base_url}/bot_TOKEN/{method}", **kwargs)
+        return post(url, **kwargs)
+    return patched_post
+
+
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("shared_adapter")
 class TestTelegramAdapterAdvanced:
     """Additional TelegramAdapter tests."""
 
-    async def test_get_topic_id_fallback_to_numeric(self, mock_telegram_server):
-        """Test _get_topic_id handles numeric task_id."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config:
-
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.get_task.return_value = None
-            mock_reg_instance.find_task_by_topic.return_value = ("numeric_task", {})
-            mock_registry.return_value = mock_reg_instance
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        """Clear recorded calls and configured returns left by the previous test.
 
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
+        Every test shares one config, so group_id is pinned to the adapter's
+        own chat id; left as a mock attribute it would leak between tests.
+        """
+        self.mock_reg.reset_mock(return_value=True, side_effect=True)
+        self.mock_cfg.reset_mock(return_value=True, side_effect=True)
+        self.mock_cfg.general_topic_id = 1
+        self.mock_cfg.group_id = -1001234567890
+        self.mock_cfg.get.return_value = 0
+        assert self.adapter.get_group_chat_id() == "-1001234567890"
 
-            from telegram_adapter import TelegramAdapter
+    async def test_get_topic_id_fallback_to_numeric(self, mock_telegram_server):
+        """Test _get_topic_id handles numeric task_id."""
+        self.mock_reg.get_task.return_value = None
+        self.mock_reg.find_task_by_topic.return_value = ("numeric_task", {})
 
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            topic_id = adapter._get_topic_id("123")
-            assert topic_id == 123
+        topic_id = self.adapter._get_topic_id("123")
+        assert topic_id == 123
 
     async def test_get_task_id_from_topic_unknown_routes_to_operator(self, mock_telegram_server):
         """Test _get_task_id_from_topic routes unknown topics to operator."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config:
-
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.find_task_by_topic.return_value = None
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_config.return_value = mock_cfg_instance
+        self.mock_reg.find_task_by_topic.return_value = None
 
-            from telegram_adapter import TelegramAdapter
-
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            task_id = adapter._get_task_id_from_topic(999)
-            # Unknown topics now route to operator instead of using string topic_id
-            assert task_id == "operator"
+        task_id = self.adapter._get_task_id_from_topic(999)
+        # Unknown topics now route to operator instead of using string topic_id
+        assert task_id == "operator"
 
     async def test_delete_message(self, mock_telegram_server):
         """Test delete_message."""
-        import requests
-
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config:
-
-            mock_reg_instance = MagicMock()
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
-
-            original_post = requests.post
-
-            def patched_post(url, **kwargs):
-                if "api.telegram.org" in url:
-                    method = url.split("/")[-1]
-                    return original_post(
-                        f"{mock_telegram_server.base_url}/bot_TOKEN/{method}",
-                        **kwargs,
-                    )
-                return original_post(url, **kwargs)
-
-            with patch.object(requests, "post", patched_post):
-                from telegram_adapter import TelegramAdapter
-
-                adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-                await adapter.delete_message("operator", "456")
-                assert 456 in mock_telegram_server.deleted_messages
+        with patch.object(requests, "post", _redirect_to_mock_server(requests.post, mock_telegram_server)):
+            await self.adapter.delete_message("operator", "456")
+            assert 456 in mock_telegram_server.deleted_messages
 
     async def test_get_topic_id_value_error(self, mock_telegram_server):
         """Test _get_topic_id returns None for non-numeric non-existent task_id."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config:
-
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.get_task.return_value = None
-            mock_reg_instance.find_task_by_topic.return_value = None
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
+        self.mock_reg.get_task.return_value = None
+        self.mock_reg.find_task_by_topic.return_value = None
 
-            from telegram_adapter import TelegramAdapter
-
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            # Non-numeric task_id that doesn't exist should return None
-            topic_id = adapter._get_topic_id("nonexistent_task")
-            assert topic_id is None
+        # Non-numeric task_id that doesn't exist should return None
+        topic_id = self.adapter._get_topic_id("nonexistent_task")
+        assert topic_id is None
 
     async def test_get_topic_id_numeric_not_found(self, mock_telegram_server):
         """Test _get_topic_id returns None for numeric task_id not found in registry."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config:
-
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.get_task.return_value = None
-            mock_reg_instance.find_task_by_topic.return_value = None  # Not found
-            mock_registry.return_value = mock_reg_instance
+        self.mock_reg.get_task.return_value = None
+        self.mock_reg.find_task_by_topic.return_value = None  # Not found
 
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
-
-            from telegram_adapter import TelegramAdapter
-
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            topic_id = adapter._get_topic_id("999")
-            assert topic_id is None
+        topic_id = self.adapter._get_topic_id("999")
+        assert topic_id is None
 
     async def test_get_task_id_from_topic_registry_lookup(self, mock_telegram_server):
         """Test _get_task_id_from_topic finds task in registry."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config:
+        self.mock_reg.find_task_by_topic.return_value = ("my_task", {"topic_id": 500})
 
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.find_task_by_topic.return_value = ("my_task", {"topic_id": 500})
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_config.return_value = mock_cfg_instance
-
-            from telegram_adapter import TelegramAdapter
-
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            task_id = adapter._get_task_id_from_topic(500)
-            assert task_id == "my_task"
+        task_id = self.adapter._get_task_id_from_topic(500)
+        assert task_id == "my_task"
 
     async def test_send_message_no_topic_found_fallback(self, mock_telegram_server):
         """Test send_message falls back to general topic when task_id not found."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config, \
-             patch("telegram_adapter.log") as mock_log:
-
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.get_task.return_value = None
-            mock_reg_instance.find_task_by_topic.return_value = None
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
-
-            original_post = requests.post
-
-            def patched_post(url, **kwargs):
-                if "api.telegram.org" in url:
-                    method = url.split("/")[-1]
-                    return original_post(
-                        f"{mock_telegram_server.base_url}/bot_TOKEN/{method}",
-                        **kwargs,
-                    )
-                return original_post(url, **kwargs)
-
-            with patch.object(requests, "post", patched_post):
-                from telegram_adapter import TelegramAdapter
-
-                adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-                msg_id = await adapter.send_message(
-                    task_id="nonexistent",
-                    content="Test",
-                )
+        self.mock_reg.get_task.return_value = None
+        self.mock_reg.find_task_by_topic.return_value = None
+
+        with patch("telegram_adapter.log") as mock_log, \
+             patch.object(requests, "post", _redirect_to_mock_server(requests.post, mock_telegram_server)):
+            msg_id = await self.adapter.send_message(
+                task_id="nonexistent",
+                content="Test",
+            )
 
-                # Should log warning
-                mock_log.assert_called()
-                # Should still send (to general topic)
-                assert msg_id != ""
+            # Should log warning
+            mock_log.assert_called()
+            # Should still send (to general topic)
+            assert msg_id != ""
 
     async def test_send_message_with_buttons(self, mock_telegram_server):
         """Test send_message with inline keyboard buttons."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config:
-
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.get_task.return_value = {"topic_id": 123}
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
-
-            original_post = requests.post
-
-            def patched_post(url, **kwargs):
-                if "api.telegram.org" in url:
-                    method = url.split("/")[-1]
-                    return original_post(
-                        f"{mock_telegram_server.base_url}/bot_TOKEN/{method}",
-                        **kwargs,
-                    )
-                return original_post(url, **kwargs)
-
-            with patch.object(requests, "post", patched_post):
-                from telegram_adapter import TelegramAdapter
-
-                adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-                msg_id = await adapter.send_message(
-                    task_id="test_task",
-                    content="Choose option",
-                    buttons=[
-                        {"text": "Allow", "callback_data": "allow:123"},
-                        {"text": "Deny", "callback_data": "deny:123"},
-                    ],
-                )
+        self.mock_reg.get_task.return_value = {"topic_id": 123}
+
+        with patch.object(requests, "post", _redirect_to_mock_server(requests.post, mock_telegram_server)):
+            msg_id = await self.adapter.send_message(
+                task_id="test_task",
+                content="Choose option",
+                buttons=[
+                    {"text": "Allow", "callback_data": "allow:123"},
+                    {"text": "Deny", "callback_data": "deny:123"},
+                ],
+            )
 
-                assert msg_id != ""
-                assert len(mock_telegram_server.sent_messages) == 1
-                sent = mock_telegram_server.sent_messages[0]
-                assert "reply_markup" in sent
+            assert msg_id != ""
+            assert len(mock_telegram_server.sent_messages) == 1
+            sent = mock_telegram_server.sent_messages[0]
+            assert "reply_markup" in sent
 
     async def test_send_message_empty_response(self, mock_telegram_server):
         """Test send_message returns empty string when API returns no message_id."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config, \
-             patch("telegram_adapter.send_to_topic") as mock_send:
-
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.get_task.return_value = {"topic_id": 123}
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
+        self.mock_reg.get_task.return_value = {"topic_id": 123}
 
+        with patch("telegram_adapter.send_to_topic") as mock_send:
             # Return response with no message_id
             mock_send.return_value = {"ok": True, "result": {}}
 
-            from telegram_adapter import TelegramAdapter
-
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            msg_id = await adapter.send_message("test_task", "Test")
+            msg_id = await self.adapter.send_message("test_task", "Test")
             assert msg_id == ""
 
-    async def test_send_message_null_response(self, mock_telegram_server):
-        """Test send_message returns empty string when API returns None."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config, \
-             patch("telegram_adapter.send_to_topic") as mock_send:
+    async def test_send_message_does_not_block_event_loop(self, mock_telegram_server):
+        """Test the blocking HTTP send runs off the event loop."""
+        self.mock_reg.get_task.return_value = {"topic_id": 123}
+        release = threading.Event()
+        released_by_loop = []
 
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.get_task.return_value = {"topic_id": 123}
-            mock_registry.return_value = mock_reg_instance
+        def blocking_send(*args, **kwargs):
+            # Only set in time if the event loop keeps running while we block
+            released_by_loop.append(release.wait(timeout=1.0))
+            return {"ok": True, "result": {"message_id": 7}}
 
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
+        async def other_work():
+            release.set()
 
-            mock_send.return_value = None
+        with patch("telegram_adapter.send_to_topic", blocking_send):
+            msg_id, _ = await asyncio.gather(
+                self.adapter.send_message("test_task", "Test"),
+                other_work(),
+            )
 
-            from telegram_adapter import TelegramAdapter
+        assert released_by_loop == [True]
+        assert msg_id == "7"
 
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            msg_id = await adapter.send_message("test_task", "Test")
+    async def test_send_message_null_response(self, mock_telegram_server):
+        """Test send_message returns empty string when API returns None."""
+        self.mock_reg.get_task.return_value = {"topic_id": 123}
+
+        with patch("telegram_adapter.send_to_topic") as mock_send:
+            mock_send.return_value = None
+
+            msg_id = await self.adapter.send_message("test_task", "Test")
             assert msg_id == ""
 
     async def test_update_message_none_buttons(self, mock_telegram_server):
         """Test update_message does nothing when buttons is None."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config:
-
-            mock_reg_instance = MagicMock()
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
-
-            from telegram_adapter import TelegramAdapter
-
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            # Should return early without making any API calls
-            await adapter.update_message("operator", "123", content="new", buttons=None)
-            # No assertions needed - just checking it doesn't error
+        # Should return early without making any API calls
+        await self.adapter.update_message("operator", "123", content="new", buttons=None)
+        # No assertions needed - just checking it doesn't error
 
     async def test_update_message_string_label(self, mock_telegram_server):
         """Test update_message with string label for buttons."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config, \
-             patch("telegram_adapter.update_message_buttons") as mock_update:
-
-            mock_reg_instance = MagicMock()
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.group_id = -1001234567890
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
-
-            from telegram_adapter import TelegramAdapter
-
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            await adapter.update_message("operator", "123", buttons="Allowed")
+        with patch("telegram_adapter.update_message_buttons") as mock_update:
+            await self.adapter.update_message("operator", "123", buttons="Allowed")
 
             mock_update.assert_called_once_with(
                 "TOKEN", "-1001234567890", 123, "Allowed"
@@ -515,62 +412,24 @@ class TestTelegramAdapterAdvanced:
 
     async def test_update_message_button_list(self, mock_telegram_server):
         """Test update_message with button list."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config:
-
-            mock_reg_instance = MagicMock()
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
-
-            from telegram_adapter import TelegramAdapter
-
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-
-            # Patch the session's post method to redirect to mock server
-            original_post = adapter._session.post
-
-            def patched_post(url, **kwargs):
-                if "api.telegram.org" in url:
-                    method = url.split("/")[-1]
-                    return original_post(
-                        f"{mock_telegram_server.base_url}/bot_TOKEN/{method}",
-                        **kwargs,
-                    )
-                return original_post(url, **kwargs)
-
-            with patch.object(adapter._session, "post", patched_post):
-                await adapter.update_message(
-                    "operator",
-                    "100",
-                    buttons=[{"text": "Done", "callback_data": "done"}],
-                )
+        # Patch the session's post method to redirect to mock server
+        patched_post = _redirect_to_mock_server(self.adapter._session.post, mock_telegram_server)
+
+        with patch.object(self.adapter._session, "post", patched_post):
+            await self.adapter.update_message(
+                "operator",
+                "100",
+                buttons=[{"text": "Done", "callback_data": "done"}],
+            )
 
-                assert len(mock_telegram_server.edited_messages) == 1
+            assert len(mock_telegram_server.edited_messages) == 1
 
     async def test_show_typing(self, mock_telegram_server):
         """Test show_typing sends chat action."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config, \
-             patch("telegram_adapter.send_chat_action") as mock_action:
+        self.mock_reg.get_task.return_value = {"topic_id": 456}
 
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.get_task.return_value = {"topic_id": 456}
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.group_id = -1001234567890
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
-
-            from telegram_adapter import TelegramAdapter
-
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            await adapter.show_typing("test_task")
+        with patch("telegram_adapter.send_chat_action") as mock_action:
+            await self.adapter.show_typing("test_task")
 
             mock_action.assert_called_once_with(
                 "TOKEN", "-1001234567890", action="typing", topic_id=456
@@ -578,24 +437,11 @@ class TestTelegramAdapterAdvanced:
 
     async def test_show_typing_no_topic(self, mock_telegram_server):
         """Test show_typing does nothing when topic not found."""
-        with patch("telegram_adapter.get_registry") as mock_registry, \
-             patch("telegram_adapter.get_config") as mock_config, \
-             patch("telegram_adapter.send_chat_action") as mock_action:
+        self.mock_reg.get_task.return_value = None
+        self.mock_reg.find_task_by_topic.return_value = None
 
-            mock_reg_instance = MagicMock()
-            mock_reg_instance.get_task.return_value = None
-            mock_reg_instance.find_task_by_topic.return_value = None
-            mock_registry.return_value = mock_reg_instance
-
-            mock_cfg_instance = MagicMock()
-            mock_cfg_instance.general_topic_id = 1
-            mock_cfg_instance.get.return_value = 0
-            mock_config.return_value = mock_cfg_instance
-
-            from telegram_adapter import TelegramAdapter
-
-            adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
-            await adapter.show_typing("nonexistent")
+        with patch("telegram_adapter.send_chat_action") as mock_action:
+            await self.adapter.show_typing("nonexistent")
 
             mock_action.assert_not_called()
 
@@ -785,7 +631,7 @@ class TestTelegramAdapterIncoming:
         assert messages[0].text == "Text after sticker"
 
     async def test_incoming_messages_request_error(self, mock_telegram_config):
-        """Test incoming_messages handles request errors gracefully."""
+        """Test incoming_messages backs off instead of hammering a failing API."""
         from telegram_adapter import TelegramAdapter
         adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=1)
 
@@ -793,13 +639,7 @@ class TestTelegramAdapterIncoming:
 
         def failing_get(url, **kwargs):
             call_count[0] += 1
-            if call_count[0] <= 1:
-                raise requests.exceptions.ConnectionError("Network error")
-            # Return empty updates on subsequent calls
-            mock_resp = MagicMock()
-            mock_resp.ok = True
-            mock_resp.json.return_value = {"ok": True, "result": []}
-            return mock_resp
+            raise requests.exceptions.ConnectionError("Network error")
 
         with patch.object(adapter._session, "get", failing_get):
             # Run for a short time to test error handling
@@ -812,8 +652,96 @@ class TestTelegramAdapterIncoming:
             except asyncio.TimeoutError:
                 pass  # Expected
 
-            # Should have logged the error
-            assert call_count[0] >= 1
+            # First retry waits >= 0.5s, so only a handful of attempts fit in 0.2s
+            assert 1 <= call_count[0] <= 3
+
+    async def test_incoming_messages_backoff_doubles_and_resets(self, mock_telegram_server, mock_telegram_config):
+        """Test the retry delay doubles per consecutive failure and resets after a good poll."""
+        from telegram_adapter import TelegramAdapter, BACKOFF_INITIAL
+        adapter = TelegramAdapter("TOKEN", "-1001234567890", timeout=0)
+        adapter._backoff = 0.001  # keep the test fast
+
+        mock_telegram_server.add_callback_update("allow:toolu_1", msg_id=5)
+        backoffs_at_failure = []
+
+        def flaky_get(url, **kwargs):
+            if len(backoffs_at_failure) < 3:
+                backoffs_at_failure.append(adapter._backoff)
+                raise requests.exceptions.ConnectionError("Network error")
+            return requests.post(
+                f"{mock_telegram_server.base_url}/bot_TOKEN/getUpdates",
+                json=kwargs["params"],
+            )
+
+        with patch.object(adapter._session, "get", flaky_get):
+            async for msg in adapter.incoming_messages():
+                break
+
+        assert backoffs_at_failure == [0.001, 0.002, 0.004]
+        assert adapter._backoff == BACKOFF_INITIAL
+
+    async def test_incoming_messages_batched(self, mock_telegram_server, telegram_adapter_with_mock, mock_telegram_config):
+        """Test a backlog of updates is drained from one getUpdates call with one offset write."""
+        mock_cfg, mock_reg = mock_telegram_config
+        mock_reg.find_task_by_topic.return_value = ("task", {})
+
+        for i in range(50):
+            mock_telegram_server.add_message_update(f"msg {i}", topic_id=123)
+
+        poller = telegram_adapter_with_mock.incoming_messages()
+        messages = [await anext(poller) for _ in range(50)]
+        await poller.aclose()  # offset is persisted when the batch finishes or the poller closes
+
+        assert [m.text for m in messages] == [f"msg {i}" for i in range(50)]
+        assert len(mock_telegram_server.get_updates_calls) == 1
+        assert mock_telegram_server.get_updates_calls[0]["limit"] == 100
+        mock_cfg.set.assert_called_once_with("telegram_offset", 51)
+
+    async def test_incoming_messages_resumes_buffered_batch(self, mock_telegram_server, telegram_adapter_with_mock, mock_telegram_config):
+        """Test updates left in the batch when a consumer stops are yielded later without re-polling."""
+        mock_cfg, mock_reg = mock_telegram_config
+        mock_reg.find_task_by_topic.return_value = ("task", {})
+
+        for i in range(3):
+            mock_telegram_server.add_message_update(f"msg {i}", topic_id=123)
+
+        first = telegram_adapter_with_mock.incoming_messages()
+        assert (await anext(first)).text == "msg 0"
+        await first.aclose()
+
+        second = telegram_adapter_with_mock.incoming_messages()
+        rest = [(await anext(second)).text for _ in range(2)]
+        await second.aclose()
+
+        assert rest == ["msg 1", "msg 2"]
+        assert len(mock_telegram_server.get_updates_calls) == 1
+        assert telegram_adapter_with_mock._pending == deque()
+
+    async def test_incoming_messages_long_poll_params(self, mock_telegram_server, mock_telegram_config):
+        """Test the production adapter long-polls with a read timeout above the poll timeout."""
+        from telegram_adapter import TelegramAdapter
+        adapter = TelegramAdapter("TOKEN", "-1001234567890")  # default timeout, as in the daemon
+
+        mock_telegram_server.add_callback_update("allow:toolu_1", msg_id=5)
+        calls = []
+
+        def recording_get(url, **kwargs):
+            calls.append(kwargs)
+            # The mock server answers immediately, so the long poll never blocks here
+            return requests.post(
+                f"{mock_telegram_server.base_url}/bot_TOKEN/getUpdates",
+                json=kwargs["params"],
+            )
+
+        with patch.object(adapter._session, "get", recording_get):
+            async for msg in adapter.incoming_messages():
+                break
+
+        params = calls[0]["params"]
+        assert params["timeout"] >= 20
+        assert params["timeout"] == adapter.timeout
+        assert json.loads(params["allowed_updates"]) == ["message", "callback_query"]
+        assert calls[0]["timeout"] > params["timeout"]
 
     async def test_incoming_messages_reply_to(self, mock_telegram_server, telegram_adapter_with_mock, mock_telegram_config):
         """Test incoming_messages parses reply_to_message."""